@@ -17,6 +17,9 @@ import os
 import re
 import importlib
 import platform
+import subprocess
+import sys
+import types
 
 
 class TestPackaging(unittest.TestCase):
@@ -96,6 +99,39 @@ class TestPackaging(unittest.TestCase):
             self.assertTrue(os.path.isfile(filename), msg="schema file %r is missing!" % filename)
             self.assertIsInstance(et.parse(filename), et.ElementTree)
 
+    def test_public_api_names(self):
+        xmlschema = importlib.import_module('xmlschema')
+        for name in xmlschema.__all__:
+            self.assertIsNotNone(getattr(xmlschema, name), msg="%r is not importable" % name)
+            self.assertIn(name, dir(xmlschema))
+
+        with self.assertRaises(AttributeError):
+            getattr(xmlschema, 'unknown_name')
+
+        submodules = {'validators', 'resources', 'documents', 'converters', 'etree',
+                      'xpath', 'qnames', 'namespaces', 'helpers', 'compat'}
+        for name in submodules:
+            module = getattr(xmlschema, name)
+            self.assertEqual(module.__name__, 'xmlschema.' + name)
+            self.assertIn(name, dir(xmlschema))
+
+        self.assertNotIn('sys', dir(xmlschema))
+        self.assertNotIn('importlib', dir(xmlschema))
+        public_names = {name for name in dir(xmlschema) if not name.startswith('_')
+                        and not isinstance(getattr(xmlschema, name), types.ModuleType)}
+        self.assertSetEqual(public_names, set(xmlschema.__all__) - {'limits'})
+        self.assertTrue(hasattr(xmlschema.validators, 'XsdComplexType'))
+
+    @unittest.skipIf(sys.version_info < (3, 7), "module __getattr__ requires Python 3.7+")
+    def test_lazy_package_import(self):
+        script = "import sys, xmlschema; " \
+                 "assert 'xmlschema.validators' not in sys.modules; " \
+                 "xmlschema.XMLSchema; " \
+                 "assert 'xmlschema.validators' in sys.modules"
+        process = subprocess.run([sys.executable, '-c', script], cwd=self.package_dir,
+                                 stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        self.assertEqual(process.returncode, 0, msg=process.stderr.decode('utf-8'))
+
 
 if __name__ == '__main__':
     package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
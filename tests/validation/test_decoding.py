@@ -9,6 +9,7 @@
 # @author Davide Brunato <brunato@sissa.it>
 #
 import unittest
+import copy
 import os
 from decimal import Decimal
 import base64
@@ -494,6 +495,42 @@ class TestDecoding(XsdValidatorTestCase):
         os.remove(self.col_json_file)
         self.check_etree_elements(col_xml_tree.getroot(), root)
 
+    def test_json_options_argument(self):
+        json_options = {'indent': 2}
+        json_data = xmlschema.to_json(self.col_xml_file, lazy=True, json_options=json_options)
+        self.assertDictEqual(json_options, {'indent': 2})
+        self.assertIn('\n  "@xmlns:col"', json_data)
+
+        json_options = {'strict': True}
+        root = xmlschema.from_json(json_data, self.col_schema, json_options=json_options)
+        self.assertDictEqual(json_options, {'strict': True})
+        self.check_etree_elements(ElementTree.parse(self.col_xml_file).getroot(), root)
+
+    def test_iter_to_json(self):
+        vh_2_file = self.casepath('examples/vehicles/vehicles-2_errors.xml')
+        xml_files = [self.vh_xml_file, vh_2_file, self.vh_xml_file]
+        vh_json = xmlschema.to_json(self.vh_xml_file)
+
+        results = xmlschema.iter_to_json(xml_files, schema=self.vh_schema)
+        self.assertEqual(next(results), vh_json)
+        with self.assertRaises(XMLSchemaValidationError):
+            next(results)
+
+        self.assertListEqual(
+            list(xmlschema.iter_to_json([self.col_xml_file], schema=self.col_xsd_file)),
+            [xmlschema.to_json(self.col_xml_file)]
+        )
+        self.assertListEqual(
+            list(xmlschema.iter_to_json(xml_files[::2], self.vh_xsd_file, lazy=True)),
+            [vh_json, vh_json]
+        )
+
+        results = list(xmlschema.iter_to_json(xml_files, self.vh_schema, validation='lax'))
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0], (vh_json, ()))
+        self.assertEqual(len(results[1][1]), 2)
+        self.assertEqual(results[2], (vh_json, ()))
+
     def test_json_path_decoding(self):
         xml_file = self.col_xml_file
         schema = self.col_schema
@@ -514,6 +551,39 @@ class TestDecoding(XsdValidatorTestCase):
             json_data, xmlschema.to_json(xml_file, schema=schema, path='/col:collection/object')
         )
 
+        with open(self.col_json_file, 'w') as f:
+            self.assertIsNone(xmlschema.to_json(xml_file, f, schema=schema, path='*'))
+        with open(self.col_json_file) as f:
+            self.assertEqual(f.read(), json_data)
+
+        with open(self.col_json_file, 'w') as f:
+            self.assertEqual(xmlschema.to_json(
+                xml_file, f, schema=schema, path='object[1]', validation='lax'
+            ), ())
+        with open(self.col_json_file) as f:
+            self.assertEqual(
+                f.read(), xmlschema.to_json(xml_file, schema=schema, path='object[1]')
+            )
+
+        with open(self.col_json_file, 'w') as f:
+            xmlschema.to_json(xml_file, f, schema=schema, path='object',
+                              json_options={'separators': (',', ':')})
+        with open(self.col_json_file) as f:
+            self.assertEqual(f.read(), xmlschema.to_json(
+                xml_file, schema=schema, path='object', json_options={'separators': (',', ':')}
+            ))
+
+        # An invalid element after the second one is reported after the others are written
+        xml_root = ElementTree.parse(xml_file).getroot()
+        xml_root.append(copy.deepcopy(xml_root[1]))
+        xml_root[2].set('available', 'maybe')
+        with open(self.col_json_file, 'w') as f:
+            with self.assertRaises(XMLSchemaValidationError):
+                xmlschema.to_json(xml_root, f, schema=schema, path='object')
+        with open(self.col_json_file) as f:
+            self.assertTrue(f.read().startswith('[{"@id": "b0836217462"'))
+        os.remove(self.col_json_file)
+
     def test_json_lazy_decoding(self):
         kwargs = {'xml_document': self.col_xml_file, 'schema': self.col_schema}
 
@@ -9,8 +9,11 @@
 # @author Davide Brunato <brunato@sissa.it>
 #
 import unittest
+from unittest.mock import patch
 import os
 import sys
+import tempfile
+import threading
 
 import xmlschema
 from xmlschema import XMLSchemaValidationError
@@ -104,6 +107,167 @@ class TestValidation(XsdValidatorTestCase):
         self.assertIsInstance(errors[0], XMLSchemaValidationError)
         self.assertIsInstance(errors[1], XMLSchemaValidationError)
 
+    def test_document_api_schema_cache(self):
+        from xmlschema.documents import get_context, _schema_cache
+
+        xmlschema.clear_schema_cache()
+        _, schema1 = get_context(self.vh_xml_file)
+        _, schema2 = get_context(self.vh_xml_file)
+        self.assertIs(schema1, schema2)
+        self.assertEqual(len(_schema_cache), 1)
+
+        _, schema3 = get_context(self.vh_xml_file, schema=self.vh_xsd_file, cls=XMLSchema11)
+        self.assertIsNot(schema1, schema3)
+        self.assertIsInstance(schema3, XMLSchema11)
+        self.assertEqual(len(_schema_cache), 2)
+
+        xmlschema.clear_schema_cache()
+        self.assertEqual(len(_schema_cache), 0)
+        _, schema4 = get_context(self.vh_xml_file)
+        self.assertIsNot(schema1, schema4)
+
+    def test_document_api_resource_cache(self):
+        from xmlschema import documents
+
+        xmlschema.clear_schema_cache()
+        with patch.object(documents, 'fetch_resource',
+                          side_effect=documents.fetch_resource) as mocked:
+            self.assertIsNone(xmlschema.validate(self.vh_xml_file))
+            self.assertIsNone(xmlschema.validate(self.vh_xml_file))
+            self.assertTrue(xmlschema.is_valid(self.vh_xml_file))
+            self.assertEqual(mocked.call_count, 1)
+            self.assertEqual(len(documents._resource_cache), 1)
+
+            xmlschema.clear_schema_cache()
+            self.assertEqual(len(documents._resource_cache), 0)
+            self.assertIsNone(xmlschema.validate(self.vh_xml_file))
+            self.assertEqual(mocked.call_count, 2)
+
+    def test_document_api_schema_cache_threads(self):
+        from xmlschema import documents
+
+        def validate(xml_file):
+            try:
+                for _ in range(10):
+                    xmlschema.validate(xml_file)
+            except Exception as err:
+                errors.append(err)
+
+        errors = []
+        max_size = documents.SCHEMA_CACHE_MAXSIZE
+        documents.SCHEMA_CACHE_MAXSIZE = 1  # Force evictions between threads
+        try:
+            threads = [threading.Thread(target=validate, args=(xml_file,))
+                       for xml_file in [self.vh_xml_file, self.col_xml_file] * 4]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            documents.SCHEMA_CACHE_MAXSIZE = max_size
+            xmlschema.clear_schema_cache()
+
+        self.assertListEqual(errors, [])
+
+    def test_document_api_rewritten_document(self):
+        xml_template = '<root xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" ' \
+                       'xsi:noNamespaceSchemaLocation="{}">{}</root>'
+        xsd_template = '<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">' \
+                       '<xs:element name="root" type="{}"/></xs:schema>'
+
+        with tempfile.TemporaryDirectory() as dirname:
+            xml_file = os.path.join(dirname, 'doc.xml')
+            for name, xsd_type in [('a.xsd', 'xs:int'), ('b.xsd', 'xs:string')]:
+                with open(os.path.join(dirname, name), 'w') as fp:
+                    fp.write(xsd_template.format(xsd_type))
+
+            with open(xml_file, 'w') as fp:
+                fp.write(xml_template.format('a.xsd', '1'))
+            self.assertTrue(xmlschema.is_valid(xml_file))
+
+            with open(xml_file, 'w') as fp:
+                fp.write(xml_template.format('b.xsd', 'hello'))
+            self.assertTrue(xmlschema.is_valid(xml_file))
+
+    def test_document_api_locations_argument(self):
+        from xmlschema.documents import resolve_schema_locations
+
+        source = xmlschema.XMLResource(self.vh_xml_file)
+        schema_url, locations = resolve_schema_locations(source)
+        self.assertTrue(schema_url.endswith('vehicles.xsd'))
+        self.assertEqual(len(locations), 1)
+
+        # For a lazy resource a reachable location for its namespace skips the XML data scan
+        source = xmlschema.XMLResource(self.vh_xml_file, lazy=True)
+        locations = {'http://example.com/vehicles': self.vh_xsd_file}
+        schema_url, location_hints = resolve_schema_locations(source, locations)
+        self.assertTrue(schema_url.endswith('vehicles.xsd'))
+        self.assertEqual(location_hints, [('http://example.com/vehicles', schema_url)] * 2)
+
+        source = xmlschema.XMLResource(self.vh_xml_file)
+        locations = {'http://example.com/vehicles': 'missing.xsd'}
+        schema_url, location_hints = resolve_schema_locations(source, locations)
+        self.assertTrue(schema_url.endswith('vehicles.xsd'))
+        self.assertEqual(len(location_hints), 2)
+
+        self.assertIsNone(xmlschema.validate(
+            ElementTree.parse(self.vh_xml_file),
+            locations={'http://example.com/vehicles': self.vh_xsd_file}
+        ))
+
+    def test_document_api_locations_argument_with_imports(self):
+        from xmlschema.documents import resolve_schema_locations
+
+        with tempfile.TemporaryDirectory() as dirname:
+            with open(os.path.join(dirname, 'a.xsd'), 'w') as fp:
+                fp.write("""<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema"
+                    xmlns:b="urn:b" targetNamespace="urn:a">
+                  <xs:import namespace="urn:b"/>
+                  <xs:element name="root">
+                    <xs:complexType>
+                      <xs:sequence>
+                        <xs:element ref="b:item"/>
+                        <xs:any namespace="##other" processContents="strict"/>
+                      </xs:sequence>
+                    </xs:complexType>
+                  </xs:element>
+                </xs:schema>""")
+            for ns in ('b', 'c'):
+                with open(os.path.join(dirname, '{}.xsd'.format(ns)), 'w') as fp:
+                    fp.write("""<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema"
+                        targetNamespace="urn:{}">
+                      <xs:element name="item" type="xs:string"/>
+                    </xs:schema>""".format(ns))
+
+            xml_file = os.path.join(dirname, 'doc.xml')
+            with open(xml_file, 'w') as fp:
+                fp.write("""<a:root xmlns:a="urn:a" xmlns:b="urn:b" xmlns:c="urn:c"
+                    xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
+                    xsi:schemaLocation="urn:a a.xsd urn:b b.xsd">
+                  <b:item>foo</b:item>
+                  <c:item xsi:schemaLocation="urn:c c.xsd">bar</c:item>
+                </a:root>""")
+
+            # Provided hints are additional: hints of inner elements are still collected
+            source = xmlschema.XMLResource(xml_file, lazy=False)
+            schema_url, location_hints = resolve_schema_locations(source, {'urn:a': 'a.xsd'})
+            self.assertTrue(schema_url.endswith('/a.xsd'))
+            self.assertListEqual([ns for ns, _ in location_hints],
+                                 ['urn:a', 'urn:a', 'urn:b', 'urn:c'])
+
+            self.assertIsNone(xmlschema.validate(xml_file))
+            self.assertIsNone(xmlschema.validate(xml_file, locations={'urn:a': 'a.xsd'}))
+
+            # For lazy resources only the hints of the root element are added
+            source = xmlschema.XMLResource(xml_file, lazy=True)
+            schema_url, location_hints = resolve_schema_locations(source, {'urn:a': 'a.xsd'})
+            self.assertTrue(schema_url.endswith('/a.xsd'))
+            self.assertListEqual([ns for ns, _ in location_hints], ['urn:a', 'urn:a', 'urn:b'])
+
+            source = xmlschema.XMLResource(xml_file, lazy=True)
+            schema_url, location_hints = resolve_schema_locations(source)
+            self.assertListEqual([ns for ns, _ in location_hints], ['urn:a', 'urn:b', 'urn:c'])
+
     def test_max_depth_argument(self):
         schema = self.schema_class(self.col_xsd_file)
         self.assertEqual(
@@ -35,6 +35,12 @@ class TestXsd10Notations(unittest.TestCase):
             </xs:schema>""")
         self.assertIn("notation must have a 'public' or a 'system' attribute", str(ctx.exception))
 
+        schema = self.schema_class("""
+        <xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">
+            <xs:notation name="content" id="notation1"/>
+        </xs:schema>""", validation='lax')
+        self.assertEqual(len(schema.all_errors), 1)  # reported once per declaration
+
         with self.assertRaises(XMLSchemaParseError) as ctx:
             self.schema_class("""
             <xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">
@@ -8,27 +8,93 @@
 #
 # @author Davide Brunato <brunato@sissa.it>
 #
+import sys as _sys
+import importlib as _importlib
+
 from . import limits
 from .exceptions import XMLSchemaException, XMLSchemaRegexError, \
     XMLSchemaResourceError, XMLSchemaNamespaceError
-from .etree import etree_tostring
-from .resources import normalize_url, normalize_locations, fetch_resource, \
-    fetch_namespaces, fetch_schema_locations, fetch_schema, XMLResource
-from .xpath import ElementPathMixin
-from .converters import (
-    ElementData, XMLSchemaConverter, UnorderedConverter, ParkerConverter,
-    BadgerFishConverter, AbderaConverter, JsonMLConverter, ColumnarConverter
-)
-from .documents import validate, is_valid, iter_errors, to_dict, to_json, from_json
-
-from .validators import (
-    XMLSchemaValidatorError, XMLSchemaParseError, XMLSchemaNotBuiltError,
-    XMLSchemaModelError, XMLSchemaModelDepthError, XMLSchemaValidationError,
-    XMLSchemaDecodeError, XMLSchemaEncodeError, XMLSchemaChildrenValidationError,
-    XMLSchemaIncludeWarning, XMLSchemaImportWarning, XMLSchemaTypeTableWarning,
-    XsdGlobals, XMLSchemaBase, XMLSchema, XMLSchema10, XMLSchema11,
-    XsdComponent, XsdType, XsdElement, XsdAttribute
-)
+
+# Other public names are imported from submodules at first access (PEP 562),
+# so importing the package doesn't load the validators and the meta-schemas.
+_LAZY_IMPORTS = {
+    'etree_tostring': '.etree',
+    'normalize_url': '.resources',
+    'normalize_locations': '.resources',
+    'fetch_resource': '.resources',
+    'fetch_namespaces': '.resources',
+    'fetch_schema_locations': '.resources',
+    'fetch_schema': '.resources',
+    'XMLResource': '.resources',
+    'ElementPathMixin': '.xpath',
+    'ElementData': '.converters',
+    'XMLSchemaConverter': '.converters',
+    'UnorderedConverter': '.converters',
+    'ParkerConverter': '.converters',
+    'BadgerFishConverter': '.converters',
+    'AbderaConverter': '.converters',
+    'JsonMLConverter': '.converters',
+    'ColumnarConverter': '.converters',
+    'validate': '.documents',
+    'is_valid': '.documents',
+    'iter_errors': '.documents',
+    'to_dict': '.documents',
+    'to_json': '.documents',
+    'iter_to_json': '.documents',
+    'from_json': '.documents',
+    'clear_schema_cache': '.documents',
+    'XMLSchemaValidatorError': '.validators',
+    'XMLSchemaParseError': '.validators',
+    'XMLSchemaNotBuiltError': '.validators',
+    'XMLSchemaModelError': '.validators',
+    'XMLSchemaModelDepthError': '.validators',
+    'XMLSchemaValidationError': '.validators',
+    'XMLSchemaDecodeError': '.validators',
+    'XMLSchemaEncodeError': '.validators',
+    'XMLSchemaChildrenValidationError': '.validators',
+    'XMLSchemaIncludeWarning': '.validators',
+    'XMLSchemaImportWarning': '.validators',
+    'XMLSchemaTypeTableWarning': '.validators',
+    'XsdGlobals': '.validators',
+    'XMLSchemaBase': '.validators',
+    'XMLSchema': '.validators',
+    'XMLSchema10': '.validators',
+    'XMLSchema11': '.validators',
+    'XsdComponent': '.validators',
+    'XsdType': '.validators',
+    'XsdElement': '.validators',
+    'XsdAttribute': '.validators',
+}
+
+# Submodules that were loaded at package import time, still accessible as attributes
+_LAZY_SUBMODULES = {
+    'validators', 'resources', 'documents', 'converters', 'etree',
+    'xpath', 'qnames', 'namespaces', 'helpers', 'compat',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_SUBMODULES:
+        return _importlib.import_module('.' + name, __name__)
+
+    try:
+        module_name = _LAZY_IMPORTS[name]
+    except KeyError:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name)) from None
+
+    value = globals()[name] = getattr(_importlib.import_module(module_name, __name__), name)
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()).union(_LAZY_IMPORTS, _LAZY_SUBMODULES))
+
+
+if _sys.version_info < (3, 7):
+    # Module level __getattr__ is not supported, import all the names
+    for _name in _LAZY_SUBMODULES.union(_LAZY_IMPORTS):
+        __getattr__(_name)
+    del _name
 
 __version__ = '1.2.4'
 __author__ = "Davide Brunato"
@@ -45,11 +111,11 @@ __all__ = [
     'XMLResource', 'ElementPathMixin', 'ElementData', 'XMLSchemaConverter',
     'UnorderedConverter', 'ParkerConverter', 'BadgerFishConverter', 'AbderaConverter',
     'JsonMLConverter', 'ColumnarConverter', 'validate', 'is_valid', 'iter_errors',
-    'to_dict', 'to_json', 'from_json', 'XMLSchemaValidatorError', 'XMLSchemaParseError',
-    'XMLSchemaNotBuiltError', 'XMLSchemaModelError', 'XMLSchemaModelDepthError',
-    'XMLSchemaValidationError', 'XMLSchemaDecodeError', 'XMLSchemaEncodeError',
-    'XMLSchemaChildrenValidationError', 'XMLSchemaIncludeWarning',
-    'XMLSchemaImportWarning', 'XMLSchemaTypeTableWarning',
+    'to_dict', 'to_json', 'iter_to_json', 'from_json', 'clear_schema_cache',
+    'XMLSchemaValidatorError', 'XMLSchemaParseError', 'XMLSchemaNotBuiltError',
+    'XMLSchemaModelError', 'XMLSchemaModelDepthError', 'XMLSchemaValidationError',
+    'XMLSchemaDecodeError', 'XMLSchemaEncodeError', 'XMLSchemaChildrenValidationError',
+    'XMLSchemaIncludeWarning', 'XMLSchemaImportWarning', 'XMLSchemaTypeTableWarning',
     'XsdGlobals', 'XMLSchemaBase', 'XMLSchema', 'XMLSchema10', 'XMLSchema11',
     'XsdComponent', 'XsdType', 'XsdElement', 'XsdAttribute',
 ]
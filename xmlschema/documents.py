@@ -8,13 +8,142 @@
 # @author Davide Brunato <brunato@sissa.it>
 #
 import json
+import threading
+from collections import OrderedDict
 from collections.abc import Iterator
 
 from .compat import ordered_dict_class
 from .qnames import XSI_TYPE
-from .resources import fetch_schema_locations, XMLResource
+from .exceptions import XMLSchemaValueError, XMLSchemaResourceError
+from .resources import is_url, normalize_url, normalize_locations, \
+    fetch_resource, XMLResource
 from .validators import XMLSchema, XMLSchemaBase, XMLSchemaValidationError
 
+SCHEMA_CACHE_MAXSIZE = 32
+RESOURCE_CACHE_MAXSIZE = 128
+
+_schema_cache = OrderedDict()
+_resource_cache = OrderedDict()
+_schema_cache_lock = threading.Lock()
+
+
+def get_schema(source, cls, locations=None, base_url=None, defuse='remote', timeout=300):
+    """
+    Builds a schema instance for the document API functions. Schemas built from
+    an URL or a file path are cached, so repeated calls for the same source reuse
+    the compiled schema instead of building it again. Changes to a cached schema
+    file are not seen until :meth:`clear_schema_cache` is called.
+
+    :return: a schema instance of the class *cls*.
+    """
+    if not is_url(source):
+        return cls(source, validation='strict', locations=locations,
+                   base_url=base_url, defuse=defuse, timeout=timeout)
+
+    key = (
+        normalize_url(source, base_url),
+        cls,
+        tuple(sorted(normalize_locations(locations, base_url))) if locations else (),
+        defuse,
+    )
+    with _schema_cache_lock:
+        schema = _schema_cache.get(key)
+        if schema is not None:
+            _schema_cache.move_to_end(key)
+            return schema
+
+    # Build the schema outside the lock, other threads can use the cache meanwhile
+    schema = cls(source, validation='strict', locations=locations,
+                 base_url=base_url, defuse=defuse, timeout=timeout)
+
+    with _schema_cache_lock:
+        schema = _schema_cache.setdefault(key, schema)
+        _schema_cache.move_to_end(key)
+        if len(_schema_cache) > SCHEMA_CACHE_MAXSIZE:
+            _schema_cache.popitem(last=False)
+    return schema
+
+
+def get_resource_url(location, base_url=None, timeout=30):
+    """
+    Like :meth:`fetch_resource` but caches the URLs of the reachable resources,
+    so a schema location is accessed only the first time it's resolved.
+
+    :return: a normalized URL.
+    """
+    key = location, base_url
+    with _schema_cache_lock:
+        url = _resource_cache.get(key)
+        if url is not None:
+            _resource_cache.move_to_end(key)
+            return url
+
+    url = fetch_resource(location, base_url, timeout)  # Not reachable locations are not cached
+
+    with _schema_cache_lock:
+        _resource_cache[key] = url
+        if len(_resource_cache) > RESOURCE_CACHE_MAXSIZE:
+            _resource_cache.popitem(last=False)
+    return url
+
+
+def resolve_schema_locations(source, locations=None, timeout=30):
+    """
+    Resolves the schema location for an XML resource, like :meth:`fetch_schema_locations`
+    but accessing the schema locations through :meth:`get_resource_url`. For a lazy
+    resource, if location hints are provided and a hint for the namespace of the
+    resource, provided or declared in the root element, is reachable, only the hints
+    of the root element are added, avoiding a second parse of the XML data.
+
+    :param source: an :class:`XMLResource` instance.
+    :param locations: a dictionary or dictionary items with additional schema location hints.
+    :param timeout: the timeout in seconds for the connection attempt in case of remote data.
+    :return: A 2-tuple with the URL referring to the first reachable schema resource \
+    and a list of dictionary items with normalized location hints.
+    """
+    namespace = source.namespace
+    if locations and source.is_lazy():
+        # The location hints declared in inner elements are not collected in this case
+        location_hints = source.get_locations(locations, root_only=True)
+        for ns, url in location_hints:
+            if ns == namespace:
+                try:
+                    return get_resource_url(url, source.base_url, timeout), location_hints
+                except XMLSchemaResourceError:
+                    pass
+
+    location_hints = source.get_locations(locations, root_only=False)
+    if not location_hints:
+        msg = "the XML data resource {!r} does not contain any schema location hint."
+        raise XMLSchemaValueError(msg.format(source))
+
+    for ns, url in sorted(location_hints, key=lambda x: x[0] != namespace):
+        try:
+            return get_resource_url(url, source.base_url, timeout), location_hints
+        except XMLSchemaResourceError:
+            pass
+
+    raise XMLSchemaValueError("not found a schema for XML data resource {!r}.".format(source))
+
+
+def clear_schema_cache():
+    """
+    Clears the caches of the schemas and of the schema locations used by the
+    document API functions. Call it after changing a schema file, otherwise the
+    document API functions keep using the schema built before the changes.
+    """
+    with _schema_cache_lock:
+        _schema_cache.clear()
+        _resource_cache.clear()
+
+
+def is_schema(obj, cls=XMLSchema):
+    """
+    Returns `True` if the argument is a schema instance. The type identity with
+    *cls* is checked first, avoiding the ABC instance check for the common case.
+    """
+    return type(obj) is cls or isinstance(obj, XMLSchemaBase)
+
 
 def get_context(source, schema=None, cls=None, locations=None, base_url=None,
                 defuse='remote', timeout=300, lazy=False):
@@ -27,22 +156,23 @@ def get_context(source, schema=None, cls=None, locations=None, base_url=None,
         cls = XMLSchema
     if not isinstance(source, XMLResource):
         source = XMLResource(source, base_url, defuse=defuse, timeout=timeout, lazy=lazy)
-    if isinstance(schema, XMLSchemaBase) and source.namespace in schema.maps.namespaces:
+
+    schema_instance = is_schema(schema, cls)
+    if schema_instance and source.namespace in schema.maps.namespaces:
         return source, schema
 
     try:
-        schema_location, locations = fetch_schema_locations(source, locations, base_url=base_url)
+        schema_location, locations = resolve_schema_locations(source, locations, timeout)
     except ValueError:
         if schema is None:
             if XSI_TYPE not in source.root.attrib:
                 raise
             schema = cls.meta_schema
-        elif not isinstance(schema, XMLSchemaBase):
-            schema = cls(schema, validation='strict', locations=locations,
-                         base_url=base_url, defuse=defuse, timeout=timeout)
+        elif not schema_instance:
+            schema = get_schema(schema, cls, locations, base_url, defuse, timeout)
     else:
-        schema = cls(schema or schema_location, validation='strict', locations=locations,
-                     defuse=defuse, timeout=timeout)
+        schema = get_schema(schema or schema_location, cls, locations,
+                            defuse=defuse, timeout=timeout)
 
     return source, schema
 
@@ -63,6 +193,53 @@ def get_lazy_json_encoder(errors):
     return JSONLazyEncoder
 
 
+def stream_to_json(fp, results, validation='strict', json_options=None):
+    """
+    Serializes to a file-like object the data decoded by :meth:`XMLSchema.iter_decode`,
+    writing each decoded object as soon as it's available instead of collecting all of
+    them in a list. The JSON data written is the same obtained serializing the result
+    of :meth:`XMLSchema.decode` without indentation.
+
+    :param fp: a :meth:`write()` supporting file-like object.
+    :param results: an iterator of decoded data and validation errors.
+    :param validation: the XSD validation mode used for decoding.
+    :param json_options: a dictionary with options for the JSON serializer.
+    :return: a list with the validation errors collected in 'lax' mode.
+    """
+    if json_options is None:
+        json_options = {}
+    item_separator = json_options.get('separators', (', ', ': '))[0]
+
+    errors = []
+    first = None
+    count = 0
+    for result in results:
+        if isinstance(result, XMLSchemaValidationError):
+            if validation == 'strict':
+                raise result
+            elif validation == 'lax':
+                errors.append(result)
+            continue
+
+        count += 1
+        if count == 1:
+            first = result  # A single object is not serialized in a list
+            continue
+        elif count == 2:
+            fp.write('[')
+            json.dump(first, fp, **json_options)
+            first = None
+
+        fp.write(item_separator)
+        json.dump(result, fp, **json_options)
+
+    if count > 1:
+        fp.write(']')
+    else:
+        json.dump(first, fp, **json_options)
+    return errors
+
+
 def validate(xml_document, schema=None, cls=None, path=None, schema_path=None,
              use_defaults=True, namespaces=None, locations=None, base_url=None,
              defuse='remote', timeout=300, lazy=False):
@@ -77,7 +254,10 @@ def validate(xml_document, schema=None, cls=None, path=None, schema_path=None,
     a string containing the XML data. If the passed argument is not an :class:`XMLResource` \
     instance a new one is built using this and *defuse*, *timeout* and *lazy* arguments.
     :param schema: can be a schema instance or a file-like object or a file path or a URL \
-    of a resource or a string containing the schema.
+    of a resource or a string containing the schema. Schemas built from a file path \
+    or an URL, also when found by location hints, are cached and reused by later \
+    calls, so changes to a schema file are not seen until :meth:`clear_schema_cache` \
+    is called.
     :param cls: class to use for building the schema instance (for default \
     :class:`XMLSchema` is used).
     :param path: is an optional XPath expression that matches the elements of the XML \
@@ -142,7 +322,10 @@ def to_dict(xml_document, schema=None, cls=None, path=None, process_namespaces=T
     a string containing the XML data. If the passed argument is not an :class:`XMLResource` \
     instance a new one is built using this and *defuse*, *timeout* and *lazy* arguments.
     :param schema: can be a schema instance or a file-like object or a file path or a URL \
-    of a resource or a string containing the schema.
+    of a resource or a string containing the schema. Schemas built from a file path \
+    or an URL, also when found by location hints, are cached and reused by later \
+    calls, so changes to a schema file are not seen until :meth:`clear_schema_cache` \
+    is called.
     :param cls: class to use for building the schema instance (for default uses \
     :class:`XMLSchema`).
     :param path: is an optional XPath expression that matches the elements of the XML \
@@ -172,6 +355,43 @@ def to_dict(xml_document, schema=None, cls=None, path=None, process_namespaces=T
     return schema.decode(source, path=path, process_namespaces=process_namespaces, **kwargs)
 
 
+def _decode_to_json(decode, source, path, json_options, kwargs, fp=None, dumps=json.dumps):
+    """
+    Decodes an XML resource and serializes the data to JSON, writing it to *fp*
+    if it's not `None`. Returns the result of :meth:`to_json` for these arguments.
+    The *decode* argument is the bound decode method of the schema, so callers
+    that process many resources can resolve it and *dumps* only once.
+    """
+    errors = []
+    if path is None and source.is_lazy() and 'cls' not in json_options:
+        json_options = {**json_options, 'cls': get_lazy_json_encoder(errors)}
+        obj = decode(source, path=path, lazy_decode=True, **kwargs)
+    else:
+        obj = decode(source, path=path, **kwargs)
+
+    if isinstance(obj, tuple):
+        obj, validation_errors = obj  # 'lax' mode
+    else:
+        validation_errors = None
+
+    if fp is not None:
+        json.dump(obj, fp, **json_options)
+        result = None
+    else:
+        result = dumps(obj, **json_options)
+
+    # Errors of lazy decoding are collected by the encoder during serialization
+    if validation_errors is not None:
+        validation_errors.extend(errors)
+        errors = validation_errors
+    elif not errors:
+        return result
+
+    if fp is not None:
+        return tuple(errors)
+    return result, tuple(errors)
+
+
 def to_json(xml_document, fp=None, schema=None, cls=None, path=None, converter=None,
             process_namespaces=True, locations=None, base_url=None, defuse='remote',
             timeout=300, lazy=False, json_options=None, **kwargs):
@@ -184,9 +404,15 @@ def to_json(xml_document, fp=None, schema=None, cls=None, path=None, converter=N
     to a file or an URI of a resource or an Element instance or an ElementTree instance or \
     a string containing the XML data. If the passed argument is not an :class:`XMLResource` \
     instance a new one is built using this and *defuse*, *timeout* and *lazy* arguments.
-    :param fp: can be a :meth:`write()` supporting file-like object.
+    :param fp: can be a :meth:`write()` supporting file-like object. If a *path* is \
+    provided and no indentation is requested, the decoded elements are written as soon \
+    as they are available, so in case of a validation error the data written before \
+    the error is left in the file-like object.
     :param schema: can be a schema instance or a file-like object or a file path or an URL \
-    of a resource or a string containing the schema.
+    of a resource or a string containing the schema. Schemas built from a file path \
+    or an URL, also when found by location hints, are cached and reused by later \
+    calls, so changes to a schema file are not seen until :meth:`clear_schema_cache` \
+    is called.
     :param cls: schema class to use for building the instance (for default uses \
     :class:`XMLSchema`).
     :param path: is an optional XPath expression that matches the elements of the XML \
@@ -211,42 +437,94 @@ def to_json(xml_document, fp=None, schema=None, cls=None, path=None, converter=N
     return anything. If ``validation='lax'`` keyword argument is provided the validation \
     errors are collected and returned, eventually coupled in a tuple with the JSON data.
     :raises: :exc:`XMLSchemaValidationError` if the object is not decodable by \
-    the XSD component, or also if it's invalid when ``validation='strict'`` is provided.
+    the XSD component, or also if it's invalid when ``validation='strict'`` is provided. \
+    When writing to *fp* the error can be raised after a part of the JSON data has \
+    been written.
     """
     source, schema = get_context(
         xml_document, schema, cls, locations, base_url, defuse, timeout, lazy
     )
     if json_options is None:
         json_options = {}
-    if 'decimal_type' not in kwargs:
-        kwargs['decimal_type'] = float
-    if 'dict_class' not in kwargs:
-        kwargs['dict_class'] = ordered_dict_class
+    kwargs.setdefault('decimal_type', float)
+    kwargs.setdefault('dict_class', ordered_dict_class)
     kwargs['converter'] = converter
     kwargs['process_namespaces'] = process_namespaces
 
-    errors = []
+    if fp is not None and path is not None and json_options.get('indent') is None:
+        validation = kwargs.pop('validation', 'strict')
+        errors = stream_to_json(
+            fp, schema.iter_decode(source, path=path, validation=validation, **kwargs),
+            validation, json_options
+        )
+        return tuple(errors) if validation == 'lax' else None
 
-    if path is None and source.is_lazy() and 'cls' not in json_options:
-        json_options['cls'] = get_lazy_json_encoder(errors)
-        kwargs['lazy_decode'] = True
+    return _decode_to_json(schema.decode, source, path, json_options, kwargs, fp)
 
-    obj = schema.decode(source, path=path, **kwargs)
-    if isinstance(obj, tuple):
-        if fp is not None:
-            json.dump(obj[0], fp, **json_options)
-            obj[1].extend(errors)
-            return tuple(obj[1])
+
+def iter_to_json(xml_documents, schema, cls=None, path=None, converter=None,
+                 process_namespaces=True, locations=None, base_url=None, defuse='remote',
+                 timeout=300, lazy=False, json_options=None, **kwargs):
+    """
+    Serialize a sequence of XML documents to JSON using the same schema. The schema
+    and the other arguments are processed only once, so for many documents this is
+    faster than calling :meth:`to_json` for each of them. Unlike :meth:`to_json` the
+    schema is not checked against the namespace of each document nor replaced using
+    the document's location hints: all the documents are decoded with the same schema.
+
+    :param xml_documents: an iterable of XML documents. Each item can be an \
+    :class:`XMLResource` instance, a file-like object a path to a file or an URI of \
+    a resource or an Element instance or an ElementTree instance or a string containing \
+    the XML data.
+    :param schema: can be a schema instance or a file-like object or a file path or an URL \
+    of a resource or a string containing the schema. Schemas built from a file path \
+    or an URL are cached and reused by later calls, so changes to a schema file are \
+    not seen until :meth:`clear_schema_cache` is called.
+    :param cls: schema class to use for building the instance (for default uses \
+    :class:`XMLSchema`).
+    :param path: is an optional XPath expression that matches the elements of the XML \
+    data that have to be decoded. If not provided the XML root element is used.
+    :param converter: an :class:`XMLSchemaConverter` subclass or instance to use \
+    for the decoding.
+    :param process_namespaces: indicates whether to use namespace information in \
+    the decoding process.
+    :param locations: additional schema location hints, in case the schema instance \
+    has to be built.
+    :param base_url: is an optional custom base URL for remapping relative locations.
+    :param defuse: optional argument to pass for construct schema and \
+    :class:`XMLResource` instances.
+    :param timeout: optional argument to pass for construct schema and \
+    :class:`XMLResource` instances.
+    :param lazy: optional argument for construct the :class:`XMLResource` instances.
+    :param json_options: a dictionary with options for the JSON serializer.
+    :param kwargs: optional arguments of :meth:`XMLSchema.iter_decode` as keyword arguments \
+    to variate the decoding process.
+    :return: yields a string containing the JSON data for each XML document. If \
+    ``validation='lax'`` keyword argument is provided the validation errors are \
+    collected and yielded coupled in a tuple with the JSON data.
+    :raises: :exc:`XMLSchemaValidationError` if a document is not decodable by \
+    the schema, or also if it's invalid when ``validation='strict'`` is provided.
+    """
+    if cls is None:
+        cls = XMLSchema
+    if not is_schema(schema, cls):
+        schema = get_schema(schema, cls, locations, base_url, defuse, timeout)
+    if json_options is None:
+        json_options = {}
+    kwargs.setdefault('decimal_type', float)
+    kwargs.setdefault('dict_class', ordered_dict_class)
+    kwargs['converter'] = converter
+    kwargs['process_namespaces'] = process_namespaces
+
+    decode = schema.decode
+    dumps = json.dumps
+    for xml_document in xml_documents:
+        if isinstance(xml_document, XMLResource):
+            source = xml_document
         else:
-            result = json.dumps(obj[0], **json_options)
-            obj[1].extend(errors)
-            return result, tuple(obj[1])
-    elif fp is not None:
-        json.dump(obj, fp, **json_options)
-        return None if not errors else tuple(errors)
-    else:
-        result = json.dumps(obj, **json_options)
-        return result if not errors else (result, tuple(errors))
+            source = XMLResource(xml_document, base_url, defuse=defuse,
+                                 timeout=timeout, lazy=lazy)
+        yield _decode_to_json(decode, source, path, json_options, kwargs, dumps=dumps)
 
 
 def from_json(source, schema, path=None, converter=None, json_options=None, **kwargs):
@@ -269,19 +547,20 @@ def from_json(source, schema, path=None, converter=None, json_options=None, **kw
     :raises: :exc:`XMLSchemaValidationError` if the object is not encodable by the schema, \
     or also if it's invalid when ``validation='strict'`` is provided.
     """
-    if not isinstance(schema, XMLSchemaBase):
+    if not is_schema(schema):
         raise TypeError("An XMLSchema instance required for 'schema' argument: %r" % schema)
-    elif json_options is None:
-        json_options = {}
 
-    dict_class = kwargs.pop('dict_class', ordered_dict_class)
-    object_hook = json_options.pop('object_hook', ordered_dict_class)
-    object_pairs_hook = json_options.pop('object_pairs_hook', ordered_dict_class)
+    # Build the options without changing the mapping provided by the caller
+    json_options = {
+        'object_hook': ordered_dict_class,
+        'object_pairs_hook': ordered_dict_class,
+        **(json_options or {})
+    }
+    kwargs.setdefault('dict_class', ordered_dict_class)
+
     if hasattr(source, 'read'):
-        obj = json.load(source, object_hook=object_hook,
-                        object_pairs_hook=object_pairs_hook, **json_options)
+        obj = json.load(source, **json_options)
     else:
-        obj = json.loads(source, object_hook=object_hook,
-                         object_pairs_hook=object_pairs_hook, **json_options)
+        obj = json.loads(source, **json_options)
 
-    return schema.encode(obj, path=path, converter=converter, dict_class=dict_class, **kwargs)
+    return schema.encode(obj, path=path, converter=converter, **kwargs)